@@ -5,21 +5,173 @@ Monitors Uponor, Georg Fischer, and Viega for important announcements
 """
 
 import os
-import json
+import re
+import orjson
+import hashlib
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, TextIO, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import attrgetter
+from urllib.parse import urlparse
+import threading
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import diskcache
+from bs4 import BeautifulSoup, SoupStrainer
+from dateutil import parser as date_parser
+import soupsieve
 import openai
 from dataclasses import dataclass, asdict
-import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Common news/press release URL patterns
+NEWS_PATHS = ['/news', '/press', '/press-releases', '/media', '/newsroom', '/media-center']
+
+# Largest news page body that will be downloaded and parsed
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# Common news article patterns, most specific first
+ARTICLE_SELECTORS = [
+    'article', '.news-item', '.press-release',
+    '.media-item', '[class*="news"]', '[class*="press"]'
+]
+ARTICLE_SEL = soupsieve.compile(', '.join(ARTICLE_SELECTORS))
+ARTICLE_SEL_PRIORITY = [soupsieve.compile(selector) for selector in ARTICLE_SELECTORS]
+
+# Precompiled selectors for extracting fields from article elements
+TITLE_SEL = soupsieve.compile('h1, h2, h3, h4, a')
+LINK_SEL = soupsieve.compile('a[href]')
+DATE_SEL = soupsieve.compile('time, [datetime], [class*="date"]')
+
+# Default for date parsing, used to detect text that contains no year
+NO_YEAR_DATE = datetime(1, 1, 1)
+YEAR_FIRST_DATE_RE = re.compile(r'\b(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})\b')
+
+# Only build the parts of a page that can contain articles: <article> tags,
+# falling back to elements with news/press/media classes
+ARTICLE_TAGS = SoupStrainer('article')
+ARTICLE_CLASSES = SoupStrainer(attrs={'class': re.compile(r'news|press|media', re.I)})
+
+# Characters of article text kept as announcement content
+CONTENT_LIMIT = 800
+
+# Keywords for the prefilter that drops clearly irrelevant announcements before OpenAI
+IMPORTANT_TERMS = frozenset({
+    'acquisition', 'acquires', 'acquired', 'merger', 'divestment', 'restructuring',
+    'launch', 'launches', 'launched', 'introduces', 'product', 'products', 'pex', 'patent',
+    'results', 'revenue', 'sales', 'earnings', 'quarter', 'financial', 'guidance',
+    'partnership', 'partners', 'agreement', 'contract', 'project', 'investment', 'invests',
+    'plant', 'factory', 'facility', 'expansion', 'ceo', 'cfo', 'president', 'appoints',
+    'appointed', 'certification', 'approval', 'regulation', 'technology'
+})
+UNIMPORTANT_TERMS = frozenset({
+    'sustainability', 'esg', 'charity', 'charitable', 'donation', 'donates', 'volunteer',
+    'volunteers', 'community', 'booth', 'tradeshow', 'exhibition', 'webinar',
+    'newsletter', 'subscribe', 'cookie', 'cookies', 'privacy'
+})
+PREFILTER_THRESHOLD = 0.2
+WORD_RE = re.compile(r'[a-z]+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Output token budget for one announcement's analysis
+MAX_ANALYSIS_TOKENS = 300
+
+# Shared analysis instructions for single and batched OpenAI prompts
+ANALYSIS_CRITERIA = """
+1. IMPORTANCE SCORE (0.0-1.0): Rate how important this is for understanding the company's competitive position
+   - 0.0-0.3: Low importance (routine updates, minor personnel, ESG initiatives)
+   - 0.4-0.6: Medium importance (product updates, regional partnerships)
+   - 0.7-1.0: High importance (major product launches, strategic partnerships, financial results, C-suite changes)
+
+2. CATEGORY: Classify as one of: Product Launch, Financial Results, Partnership, Personnel, Project Win, Technology, Regulatory, Other
+
+3. SUMMARY: Provide a 2-3 sentence summary of the key points
+
+4. BUSINESS IMPLICATIONS: Analyze what this means for their competitive position, market strategy, or business prospects (2-3 sentences)
+
+Filter OUT announcements that are primarily about:
+- ESG/sustainability initiatives without business impact
+- Community involvement or charitable activities
+- Trade show booth announcements
+- Routine compliance updates
+- Minor personnel changes (non-C-suite)
+"""
+
+# Static system prompts, sent ahead of the per-request announcement text so
+# OpenAI's prompt cache can reuse them across calls
+SYSTEM_PROMPT = f"""You are analyzing a business announcement from a PEX (cross-linked polyethylene) piping manufacturer.
+
+Please analyze the announcement and provide:
+{ANALYSIS_CRITERIA}
+Respond in this exact JSON format:
+{{
+    "importance_score": 0.0,
+    "category": "Category",
+    "summary": "Summary text",
+    "implications": "Business implications text",
+    "should_include": true
+}}
+"""
+
+BATCH_SYSTEM_PROMPT = f"""You are analyzing business announcements from PEX (cross-linked polyethylene) piping manufacturers.
+The announcements are given as a JSON list.
+
+Please analyze each announcement and provide:
+{ANALYSIS_CRITERIA}
+Respond in this exact JSON format, with one result per announcement id:
+{{
+    "results": [
+        {{
+            "id": 0,
+            "importance_score": 0.0,
+            "category": "Category",
+            "summary": "Summary text",
+            "implications": "Business implications text",
+            "should_include": true
+        }}
+    ]
+}}
+"""
+
+def bounded_text(node, limit: int = 1000) -> str:
+    """Get up to limit characters of a node's text without walking the whole subtree"""
+    chunks = []
+    length = 0
+    for text in node.stripped_strings:
+        chunks.append(text)
+        length += len(text) + 1
+        if length >= limit:
+            break
+    return " ".join(chunks)[:limit]
+
+def prefilter_score(announcement: Dict) -> float:
+    """Score 0.0-1.0 how likely an announcement is worth analyzing, from keyword hits"""
+    words = set(WORD_RE.findall((announcement['title'] + ' ' + announcement['content']).lower()))
+    important = len(words & IMPORTANT_TERMS)
+    unimportant = len(words & UNIMPORTANT_TERMS)
+    # Lightly smoothed so announcements without keyword hits score a neutral 0.5,
+    # while two or more unimportant hits with no important ones fall below the threshold
+    return (important + 0.5) / (important + unimportant + 1)
+
+@dataclass(slots=True, frozen=True)
+class Company:
+    """Data structure for monitored companies"""
+    key: str
+    name: str
+    websites: Tuple[str, ...]
+    linkedin: str
+
+@dataclass(slots=True)
 class Announcement:
     """Data structure for announcements"""
     company: str
@@ -36,28 +188,56 @@ class Announcement:
 class CompetitorAgent:
     def __init__(self):
         self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.companies = {
-            'uponor': {
-                'name': 'Uponor',
-                'websites': ['https://www.uponor.com', 'https://www.georgfischer.com'],
-                'linkedin': 'https://www.linkedin.com/company/uponor'
-            },
-            'viega': {
-                'name': 'Viega', 
-                'websites': ['https://www.viega.com'],
-                'linkedin': 'https://www.linkedin.com/company/viega'
-            }
-        }
+        self.companies = (
+            Company(
+                key='uponor',
+                name='Uponor',
+                websites=('https://www.uponor.com', 'https://www.georgfischer.com'),
+                linkedin='https://www.linkedin.com/company/uponor'
+            ),
+            Company(
+                key='viega',
+                name='Viega',
+                websites=('https://www.viega.com',),
+                linkedin='https://www.linkedin.com/company/viega'
+            )
+        )
+        self.llm_cache = diskcache.Cache('.llm_cache')
+        self.session = self._create_session()
+        self.max_workers = 8
+        # Rate limiting: cap concurrent requests per host
+        self.per_host_concurrency = 2
+        self._host_semaphores: Dict[str, threading.Semaphore] = {}
+        self._host_lock = threading.Lock()
+        # Single timestamp shared by everything in a run
+        self._run_now = datetime.now()
         self.timestamp_file = 'last_run_timestamp.txt'
+        self.validators_file = 'http_headers.json'
+        self.page_validators = self.load_page_validators()
+        self._validators_lock = threading.Lock()
         self.reports_dir = 'reports'
         
         # Create reports directory if it doesn't exist
         os.makedirs(self.reports_dir, exist_ok=True)
 
+    def _create_session(self) -> requests.Session:
+        """Create an HTTP session that reuses connections across requests"""
+        # Not cached: fetch_page streams bodies and handles 304s itself
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.5)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(HEADERS)
+        return session
+
     def get_last_run_timestamp(self) -> datetime:
         """Get the timestamp of the last run, with max 30-day lookback"""
         try:
-            max_lookback = datetime.now() - timedelta(days=30)
+            max_lookback = self._run_now - timedelta(days=30)
             
             if os.path.exists(self.timestamp_file):
                 with open(self.timestamp_file, 'r') as f:
@@ -72,214 +252,421 @@ class CompetitorAgent:
                         return last_run
             else:
                 # If no timestamp file, look back 7 days (safe default)
-                default_lookback = datetime.now() - timedelta(days=7)
+                default_lookback = self._run_now - timedelta(days=7)
                 logger.info(f"No timestamp file found, using default 7-day lookback: {default_lookback}")
                 return default_lookback
                 
         except Exception as e:
             logger.error(f"Error reading timestamp: {e}")
             # Fall back to 7 days on error
-            return datetime.now() - timedelta(days=7)
+            return self._run_now - timedelta(days=7)
 
     def update_timestamp(self):
         """Update the timestamp file with current time"""
         try:
             with open(self.timestamp_file, 'w') as f:
-                f.write(datetime.now().isoformat())
+                f.write(self._run_now.isoformat())
         except Exception as e:
             logger.error(f"Error updating timestamp: {e}")
 
+    def load_page_validators(self) -> Dict[str, Dict[str, str]]:
+        """Load the ETag/Last-Modified headers recorded for each news page"""
+        try:
+            if os.path.exists(self.validators_file):
+                with open(self.validators_file, 'rb') as f:
+                    return orjson.loads(f.read())
+        except Exception as e:
+            logger.error(f"Error reading page validators: {e}")
+        return {}
+
+    def save_page_validators(self):
+        """Persist the ETag/Last-Modified headers recorded for each news page"""
+        try:
+            with open(self.validators_file, 'wb') as f:
+                f.write(orjson.dumps(self.page_validators, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        except Exception as e:
+            logger.error(f"Error saving page validators: {e}")
+
+    def _host_semaphore(self, url: str) -> threading.Semaphore:
+        """Get the semaphore limiting concurrent requests to the host of url"""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.Semaphore(self.per_host_concurrency)
+            return self._host_semaphores[host]
+
+    def fetch_page(self, news_url: str) -> Optional[bytes]:
+        """Fetch a single page body, respecting the per-host concurrency limit"""
+        # Ask the server to skip the body if the page hasn't changed since last run
+        headers = {}
+        validators = self.page_validators.get(news_url, {})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        
+        try:
+            with self._host_semaphore(news_url):
+                with self.session.get(news_url, timeout=10, headers=headers, stream=True) as response:
+                    if response.status_code == 304:
+                        logger.info(f"{news_url} not modified since last run")
+                        return None
+                    if response.status_code != 200:
+                        return None
+                    
+                    # Stop reading pages that are too large to be news listings
+                    content_length = response.headers.get('Content-Length', '')
+                    if content_length.isdigit() and int(content_length) > MAX_PAGE_BYTES:
+                        logger.warning(f"Skipping {news_url}: larger than {MAX_PAGE_BYTES} bytes")
+                        return None
+                    chunks = []
+                    size = 0
+                    for chunk in response.iter_content(65536):
+                        size += len(chunk)
+                        if size > MAX_PAGE_BYTES:
+                            logger.warning(f"Skipping {news_url}: larger than {MAX_PAGE_BYTES} bytes")
+                            return None
+                        chunks.append(chunk)
+                    content = b''.join(chunks)
+                    
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+        except requests.RequestException as e:
+            logger.warning(f"Error accessing {news_url}: {e}")
+            return None
+        
+        if etag or last_modified:
+            with self._validators_lock:
+                self.page_validators[news_url] = {'etag': etag, 'last_modified': last_modified}
+        
+        return content
+
+    def _parse_article_date(self, date_elem) -> Optional[datetime]:
+        """Parse an article's date element, returning None if it holds no usable date"""
+        article_date = None
+        
+        # Machine-readable datetime attributes are ISO 8601
+        if date_elem.get('datetime'):
+            try:
+                article_date = date_parser.isoparse(date_elem['datetime'])
+            except (ValueError, OverflowError):
+                pass
+        
+        if article_date is None:
+            text = date_elem.get_text()
+            try:
+                # Year-first text (YYYY-MM-DD, YYYY/MM/DD) is always year-month-day
+                year_first = YEAR_FIRST_DATE_RE.search(text)
+                if year_first:
+                    return datetime(*map(int, year_first.groups()))
+                # Other visible text follows the sites' day-first (DD.MM.YYYY) convention
+                article_date = date_parser.parse(
+                    text, fuzzy=True, dayfirst=True, default=NO_YEAR_DATE
+                )
+            except (ValueError, OverflowError):
+                return None
+            # Text such as "2 min read" parses without a year
+            if article_date.year == NO_YEAR_DATE.year:
+                return None
+        
+        # Compare in local time, like since_date
+        if article_date.tzinfo:
+            article_date = article_date.astimezone().replace(tzinfo=None)
+        return article_date
+
     def scrape_website_news(self, url: str, company: str, since_date: datetime) -> List[Dict]:
         """Scrape news/announcements from company websites"""
         announcements = []
+        seen: Set[str] = set()
         
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            news_urls = [url + path for path in NEWS_PATHS]
             
-            # Common news/press release URL patterns
-            news_paths = ['/news', '/press', '/press-releases', '/media', '/newsroom', '/media-center']
+            # Fetch all candidate pages concurrently, then parse them in order
+            with ThreadPoolExecutor(max_workers=len(news_urls)) as executor:
+                pages = list(executor.map(self.fetch_page, news_urls))
             
-            for path in news_paths:
-                try:
-                    news_url = url + path
-                    response = requests.get(news_url, headers=headers, timeout=10)
+            for news_url, content in zip(news_urls, pages):
+                if content is not None:
+                    soup = BeautifulSoup(content, 'lxml', parse_only=ARTICLE_TAGS)
+                    if not soup.find('article'):
+                        soup = BeautifulSoup(content, 'lxml', parse_only=ARTICLE_CLASSES)
                     
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Look for common news article patterns
-                        article_selectors = [
-                            'article', '.news-item', '.press-release', 
-                            '.media-item', '[class*="news"]', '[class*="press"]'
-                        ]
-                        
-                        for selector in article_selectors:
-                            articles = soup.select(selector)
+                    # Find every candidate in one pass, then keep only the
+                    # matches of the first selector that found anything
+                    candidates = ARTICLE_SEL.select(soup)
+                    for selector in ARTICLE_SEL_PRIORITY:
+                        articles = [a for a in candidates if selector.match(a)]
+                        if articles:
+                            break
+                    
+                    for article in articles:
+                        try:
+                            # Extract title
+                            title_elem = TITLE_SEL.select_one(article)
+                            if not title_elem:
+                                continue
                             
-                            for article in articles:
-                                try:
-                                    # Extract title
-                                    title_elem = article.find(['h1', 'h2', 'h3', 'h4', 'a'])
-                                    if not title_elem:
-                                        continue
-                                    
-                                    title = title_elem.get_text().strip()
-                                    
-                                    # Extract link
-                                    link_elem = article.find('a')
-                                    if link_elem and link_elem.get('href'):
-                                        article_url = link_elem.get('href')
-                                        if article_url.startswith('/'):
-                                            article_url = url + article_url
-                                    else:
-                                        article_url = news_url
-                                    
-                                    # Extract date (this is tricky and site-specific)
-                                    date_elem = article.find(['time', '[class*="date"]', '[datetime]'])
-                                    article_date = datetime.now()  # Default to now if no date found
-                                    
-                                    if date_elem:
-                                        date_str = date_elem.get('datetime') or date_elem.get_text()
-                                        # Try to parse date (simplified - would need more robust parsing)
-                                        try:
-                                            article_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                                        except:
-                                            pass
-                                    
-                                    # Only include if after since_date
-                                    if article_date >= since_date:
-                                        announcements.append({
-                                            'company': company,
-                                            'title': title,
-                                            'date': article_date.isoformat(),
-                                            'url': article_url,
-                                            'content': article.get_text()[:1000],  # First 1000 chars
-                                            'source': 'website'
-                                        })
-                                        
-                                except Exception as e:
-                                    logger.warning(f"Error processing article: {e}")
-                                    continue
+                            title = title_elem.get_text().strip()
                             
-                            if articles:  # If we found articles with this selector, break
-                                break
-                        
-                        if announcements:  # If we found announcements, break
-                            break
+                            # Extract link
+                            link_elem = LINK_SEL.select_one(article)
+                            if link_elem and link_elem.get('href'):
+                                article_url = link_elem.get('href')
+                                if article_url.startswith('/'):
+                                    article_url = url + article_url
+                                key = article_url
+                            else:
+                                article_url = news_url
+                                key = hashlib.sha1(title.encode('utf-8')).hexdigest()
+                            
+                            # Skip repeats: nested matches of the same selector, or articles
+                            # already seen on an earlier page that yielded no announcements
+                            if key in seen:
+                                continue
+                            seen.add(key)
+                            
+                            # Extract date (this is tricky and site-specific)
+                            date_elem = DATE_SEL.select_one(article)
+                            article_date = self._run_now  # Default to now if no date found
+                            
+                            if date_elem:
+                                parsed_date = self._parse_article_date(date_elem)
+                                if parsed_date:
+                                    article_date = parsed_date
+                                elif not date_elem.get('datetime'):
+                                    # Skip undated articles rather than treating them as new
+                                    logger.info(f"Skipping article with unparseable date: {title}")
+                                    continue
                             
-                except requests.RequestException as e:
-                    logger.warning(f"Error accessing {news_url}: {e}")
-                    continue
+                            # Only include if after since_date
+                            if article_date >= since_date:
+                                announcements.append({
+                                    'company': company,
+                                    'title': title,
+                                    'date': article_date.isoformat(),
+                                    'url': article_url,
+                                    'content': WHITESPACE_RE.sub(' ', bounded_text(article, CONTENT_LIMIT)).strip(),
+                                    'source': 'website'
+                                })
+                                    
+                        except Exception as e:
+                            logger.warning(f"Error processing article: {e}")
+                            continue
+                    
+                    if announcements:  # If we found announcements, break
+                        break
                     
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
             
         return announcements
 
-    def analyze_with_openai(self, announcement: Dict) -> Announcement:
-        """Use OpenAI to analyze announcement importance and generate insights"""
-        
-        prompt = f"""
-        You are analyzing a business announcement from {announcement['company']}, a PEX (cross-linked polyethylene) piping manufacturer.
-
-        Title: {announcement['title']}
-        Content: {announcement['content']}
-        Date: {announcement['date']}
-        Source: {announcement['source']}
-
-        Please analyze this announcement and provide:
-
-        1. IMPORTANCE SCORE (0.0-1.0): Rate how important this is for understanding the company's competitive position
-           - 0.0-0.3: Low importance (routine updates, minor personnel, ESG initiatives)
-           - 0.4-0.6: Medium importance (product updates, regional partnerships)
-           - 0.7-1.0: High importance (major product launches, strategic partnerships, financial results, C-suite changes)
-
-        2. CATEGORY: Classify as one of: Product Launch, Financial Results, Partnership, Personnel, Project Win, Technology, Regulatory, Other
-
-        3. SUMMARY: Provide a 2-3 sentence summary of the key points
+    def _build_announcement(self, announcement: Dict, result: Dict) -> Optional[Announcement]:
+        """Combine a scraped announcement with its OpenAI analysis"""
+        # Only include if should_include is True and importance_score > 0.3
+        if result.get('should_include', False) and result.get('importance_score', 0) > 0.3:
+            return Announcement(
+                company=announcement['company'],
+                title=announcement['title'],
+                date=announcement['date'],
+                url=announcement['url'],
+                content=announcement['content'],
+                source=announcement['source'],
+                importance_score=result['importance_score'],
+                category=result['category'],
+                summary=result['summary'],
+                implications=result['implications']
+            )
+        else:
+            return None
 
-        4. BUSINESS IMPLICATIONS: Analyze what this means for their competitive position, market strategy, or business prospects (2-3 sentences)
+    def _analysis_cache_key(self, announcement: Dict) -> str:
+        """Get the OpenAI analysis cache key for an announcement's text"""
+        text = announcement['title'] + '\n' + announcement['content']
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
-        Filter OUT announcements that are primarily about:
-        - ESG/sustainability initiatives without business impact
-        - Community involvement or charitable activities
-        - Trade show booth announcements
-        - Routine compliance updates
-        - Minor personnel changes (non-C-suite)
+    def _load_cached_analysis(self, cache_key: str, announcement: Dict) -> Tuple[bool, Optional[Announcement]]:
+        """Rebuild a cached analysis, returning (cache_hit, announcement)"""
+        cached = self.llm_cache.get(cache_key)
+        if cached is None:
+            return False, None
+        
+        try:
+            return True, self._build_announcement(announcement, cached)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            # Treat incomplete cached results as a miss so they get re-analyzed
+            logger.warning(f"Discarding invalid cached analysis: {e}")
+            self.llm_cache.delete(cache_key)
+            return False, None
 
-        Respond in this exact JSON format:
-        {{
-            "importance_score": 0.0,
-            "category": "Category",
-            "summary": "Summary text",
-            "implications": "Business implications text",
-            "should_include": true
-        }}
-        """
+    def analyze_with_openai(self, announcement: Dict) -> Announcement:
+        """Use OpenAI to analyze announcement importance and generate insights"""
+        
+        cache_key = self._analysis_cache_key(announcement)
+        cache_hit, built = self._load_cached_analysis(cache_key, announcement)
+        if cache_hit:
+            return built
+        
+        prompt = (
+            f"Company: {announcement['company']}\n"
+            f"Title: {announcement['title']}\n"
+            f"Content: {announcement['content']}\n"
+            f"Date: {announcement['date']}\n"
+            f"Source: {announcement['source']}"
+        )
 
         try:
             response = self.openai_client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=MAX_ANALYSIS_TOKENS,
+                seed=0,
                 temperature=0.3
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
+            built = self._build_announcement(announcement, result)
+            # Only cache results that produced a valid analysis
+            self.llm_cache.set(cache_key, result)
             
-            # Only include if should_include is True and importance_score > 0.3
-            if result.get('should_include', False) and result.get('importance_score', 0) > 0.3:
-                return Announcement(
-                    company=announcement['company'],
-                    title=announcement['title'],
-                    date=announcement['date'],
-                    url=announcement['url'],
-                    content=announcement['content'],
-                    source=announcement['source'],
-                    importance_score=result['importance_score'],
-                    category=result['category'],
-                    summary=result['summary'],
-                    implications=result['implications']
-                )
-            else:
-                return None
+            return built
                 
         except Exception as e:
             logger.error(f"Error analyzing announcement with OpenAI: {e}")
             return None
 
+    def _analyze_chunk(self, announcements: List[Dict]) -> List[Announcement]:
+        """Analyze several announcements with a single OpenAI request"""
+        items = [
+            {
+                'id': i,
+                'company': announcement['company'],
+                'title': announcement['title'],
+                'content': announcement['content'],
+                'date': announcement['date'],
+                'source': announcement['source']
+            }
+            for i, announcement in enumerate(announcements)
+        ]
+        
+        prompt = orjson.dumps(items).decode()
+
+        try:
+            response = self.openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=MAX_ANALYSIS_TOKENS * len(announcements),
+                seed=0,
+                temperature=0.3
+            )
+            
+            results = orjson.loads(response.choices[0].message.content).get('results', [])
+            
+        except Exception as e:
+            logger.error(f"Error analyzing announcement batch with OpenAI: {e}")
+            # Fall back to analyzing each announcement individually
+            analyzed = [self.analyze_with_openai(announcement) for announcement in announcements]
+            return [a for a in analyzed if a]
+        
+        analyzed = []
+        returned_ids: Set[int] = set()
+        for result in results:
+            try:
+                result_id = int(result['id'])
+                if not 0 <= result_id < len(announcements) or result_id in returned_ids:
+                    raise ValueError(f"unexpected id {result_id}")
+                announcement = announcements[result_id]
+                built = self._build_announcement(announcement, result)
+                self.llm_cache.set(self._analysis_cache_key(announcement), result)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed analysis result: {e}")
+                continue
+            returned_ids.add(result_id)
+            if built:
+                analyzed.append(built)
+        
+        # Analyze anything the model left out of the batch individually
+        missing = [a for i, a in enumerate(announcements) if i not in returned_ids]
+        if missing:
+            logger.warning(f"Batch analysis omitted {len(missing)} announcements, analyzing them individually")
+            for announcement in missing:
+                built = self.analyze_with_openai(announcement)
+                if built:
+                    analyzed.append(built)
+        
+        return analyzed
+
+    def analyze_batch(self, announcements: List[Dict], batch_size: int = 10) -> List[Announcement]:
+        """Analyze announcements with OpenAI in batches of batch_size"""
+        all_analyzed = []
+        
+        # Reuse cached analyses for announcements seen in previous runs
+        uncached = []
+        for announcement in announcements:
+            cache_hit, built = self._load_cached_analysis(self._analysis_cache_key(announcement), announcement)
+            if not cache_hit:
+                uncached.append(announcement)
+            elif built:
+                all_analyzed.append(built)
+        
+        chunks = [uncached[i:i + batch_size] for i in range(0, len(uncached), batch_size)]
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for analyzed in executor.map(self._analyze_chunk, chunks):
+                all_analyzed.extend(analyzed)
+        
+        return all_analyzed
+
     def collect_announcements(self, since_date: datetime) -> List[Announcement]:
         """Collect all announcements from all sources"""
-        all_announcements = []
+        raw_announcements = []
         
-        for company_key, company_info in self.companies.items():
-            logger.info(f"Collecting announcements for {company_info['name']}")
-            
-            # Scrape websites
-            for website in company_info['websites']:
-                logger.info(f"Scraping {website}")
-                raw_announcements = self.scrape_website_news(website, company_info['name'], since_date)
+        # Scrape every company website concurrently
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for company in self.companies:
+                logger.info(f"Collecting announcements for {company.name}")
                 
-                # Analyze each announcement with OpenAI
-                for raw_announcement in raw_announcements:
-                    analyzed = self.analyze_with_openai(raw_announcement)
-                    if analyzed:
-                        all_announcements.append(analyzed)
-                        
-                # Rate limiting
-                time.sleep(2)
+                for website in company.websites:
+                    logger.info(f"Scraping {website}")
+                    futures.append(executor.submit(
+                        self.scrape_website_news, website, company.name, since_date
+                    ))
             
             # Note: LinkedIn scraping would require different approach due to anti-bot measures
             # For now, we'll focus on website scraping
             
-        return all_announcements
+            # The same announcement can be published on several sites
+            seen = set()
+            for future in futures:
+                for raw_announcement in future.result():
+                    key = (raw_announcement['company'], raw_announcement['title'], raw_announcement['date'])
+                    if key not in seen:
+                        seen.add(key)
+                        raw_announcements.append(raw_announcement)
+        
+        # Skip announcements that are clearly irrelevant before paying for OpenAI
+        candidates = [a for a in raw_announcements if prefilter_score(a) >= PREFILTER_THRESHOLD]
+        if len(candidates) < len(raw_announcements):
+            logger.info(f"Prefilter dropped {len(raw_announcements) - len(candidates)} irrelevant announcements")
+        
+        # Analyze all announcements with OpenAI once scraping is done
+        return self.analyze_batch(candidates)
 
-    def generate_report(self, announcements: List[Announcement]) -> str:
-        """Generate the final report"""
+    def generate_report(self, announcements: List[Announcement], out: TextIO):
+        """Write the final report to out as each section is generated"""
         
         if not announcements:
-            return f"""# PEX Competitor Research Report
+            out.write(f"""# PEX Competitor Research Report
             
 ## Summary
 No significant announcements found since the last report.
@@ -288,60 +675,55 @@ No significant announcements found since the last report.
 - Uponor (including Georg Fischer)
 - Viega
 
-Report generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
+Report generated on: {self._run_now.strftime('%Y-%m-%d %H:%M:%S')}
+""")
+            return
 
         # Sort by company, then by date
-        announcements.sort(key=lambda x: (x.company, x.date), reverse=True)
+        announcements.sort(key=attrgetter('company', 'date'), reverse=True)
         
-        report = f"""# PEX Competitor Research Report
+        out.write(f"""# PEX Competitor Research Report
 
-Report generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Report generated on: {self._run_now.strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Executive Summary
 Found {len(announcements)} significant announcements from PEX manufacturers.
 
-"""
-
-        # Group by company
-        companies = {}
-        for announcement in announcements:
-            if announcement.company not in companies:
-                companies[announcement.company] = []
-            companies[announcement.company].append(announcement)
+""")
 
-        # Generate sections for each company
-        for company, company_announcements in companies.items():
-            report += f"\n## {company}\n\n"
+        # Generate sections for each company (announcements are already grouped by the sort)
+        for company, company_announcements in groupby(announcements, key=attrgetter('company')):
+            out.write(f"\n## {company}\n\n")
             
             for announcement in company_announcements:
-                report += f"### {announcement.title}\n"
-                report += f"**Date:** {announcement.date}\n"
-                report += f"**Category:** {announcement.category}\n"
-                report += f"**Importance Score:** {announcement.importance_score:.1f}/1.0\n"
-                report += f"**Source:** {announcement.source}\n\n"
-                report += f"**Summary:** {announcement.summary}\n\n"
-                report += f"**Business Implications:** {announcement.implications}\n\n"
-                report += f"**Source Link:** {announcement.url}\n\n"
-                report += "---\n\n"
-
-        return report
-
-    def save_report(self, report: str):
-        """Save the report to a file"""
-        timestamp = datetime.now().strftime('%Y-%m-%d')
+                out.write(
+                    f"### {announcement.title}\n"
+                    f"**Date:** {announcement.date}\n"
+                    f"**Category:** {announcement.category}\n"
+                    f"**Importance Score:** {announcement.importance_score:.1f}/1.0\n"
+                    f"**Source:** {announcement.source}\n\n"
+                    f"**Summary:** {announcement.summary}\n\n"
+                    f"**Business Implications:** {announcement.implications}\n\n"
+                    f"**Source Link:** {announcement.url}\n\n"
+                    "---\n\n"
+                )
+
+    def save_report(self, announcements: List[Announcement]):
+        """Generate the report and stream it to a file"""
+        timestamp = self._run_now.strftime('%Y-%m-%d')
         filename = f"{self.reports_dir}/competitor_report_{timestamp}.md"
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(report)
+            with open(filename, 'w', encoding='utf-8', buffering=1 << 16) as f:
+                self.generate_report(announcements, f)
             logger.info(f"Report saved to {filename}")
-        except Exception as e:
+        except OSError as e:
             logger.error(f"Error saving report: {e}")
 
     def run(self):
         """Main execution method"""
         logger.info("Starting PEX Competitor Research Agent")
+        self._run_now = datetime.now()
         
         try:
             # Get last run timestamp
@@ -352,14 +734,12 @@ Found {len(announcements)} significant announcements from PEX manufacturers.
             announcements = self.collect_announcements(since_date)
             logger.info(f"Found {len(announcements)} relevant announcements")
             
-            # Generate report
-            report = self.generate_report(announcements)
-            
-            # Save report
-            self.save_report(report)
+            # Generate and save report
+            self.save_report(announcements)
             
-            # Update timestamp
+            # Update timestamp and page validators
             self.update_timestamp()
+            self.save_page_validators()
             
             logger.info("Research agent completed successfully")
             